@@ -4,22 +4,30 @@ API v1 Routes
 This module contains all v1 API endpoints for the AI Inference Platform.
 """
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import Dict, Optional, Tuple
 
 from app.services.model import model_service
 from app.services.cache import cache_service
-from app.services.rate_limit import limiter
-from app.core.config import settings
+from app.services.rate_limit import get_client_key, get_rate_limiter
 from app.observability.metrics import metrics
-from app.observability.tracing import get_tracer
+from app.observability.tracing import get_tracer, TRACING_ON
 from opentelemetry import trace
 from starlette.requests import Request
+from starlette.responses import Response
+from contextlib import nullcontext
+import orjson
 import time
 
 tracer = get_tracer(__name__)
 
+# Fall back to a bare context manager when tracing is off so the hot path
+# never touches the OpenTelemetry context machinery
+_span = tracer.start_as_current_span if TRACING_ON else (lambda *_a, **_kw: nullcontext())
+
 router = APIRouter()
 
 
@@ -46,9 +54,28 @@ class ModelInfoResponse(BaseModel):
     description: str
 
 
-@router.post("/infer", response_model=InferenceResponse)
-@limiter.limit(f"{settings.rate_limit_per_minute}/minute")
-async def inference(request: Request, inference_request: InferenceRequest):
+# Built once at import: validates raw JSON bytes without FastAPI's body-parsing layer
+_REQUEST_ADAPTER = TypeAdapter(InferenceRequest)
+
+
+# Serialized /model bodies, keyed by the fields they are derived from
+_model_info_bodies: Dict[Tuple[str, str, str], bytes] = {}
+
+
+# Responses are built from trusted internal data and serialized with orjson directly;
+# the response models are only referenced for the OpenAPI docs.
+@router.post(
+    "/infer",
+    responses={200: {"model": InferenceResponse}},
+    # The body is parsed by hand, so describe it explicitly for the OpenAPI docs
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": InferenceRequest.model_json_schema()}},
+        }
+    },
+)
+async def inference(request: Request, rate_limiter=Depends(get_rate_limiter)):
     """
     Perform AI inference on the given prompt.
     
@@ -56,121 +83,140 @@ async def inference(request: Request, inference_request: InferenceRequest):
     Uses caching to improve performance for repeated requests.
     Rate limited to prevent abuse.
     
+    The JSON body (an InferenceRequest) is validated straight from the raw
+    bytes with a prebuilt TypeAdapter.
+    
     Args:
-        request: FastAPI Request object (needed for rate limiting)
-        inference_request: InferenceRequest containing prompt and optional parameters
+        request: FastAPI Request object (body + client address for rate limiting)
+        rate_limiter: The app's rate limiter (None if rate limiting is disabled)
         
     Returns:
         InferenceResponse with generated output and metadata
+        
+    Raises:
+        RequestValidationError: 422 if the body is not a valid InferenceRequest
+        HTTPException: 429 if the client exceeded its rate limit
     """
-    start_time = time.time()
+    try:
+        inference_request = _REQUEST_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        # Same 422 shape FastAPI produces for body validation errors
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+    
+    if rate_limiter is not None and not await rate_limiter.check(get_client_key(request)):
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded: {rate_limiter.per_minute} per 1 minute"
+        )
+    
+    start = time.perf_counter()
     metrics.increment_active_requests()
     
-    # Create a trace span for the entire inference request
-    with tracer.start_as_current_span("inference_request") as span:
-        span.set_attribute("prompt.length", len(inference_request.prompt))
-        span.set_attribute("max_tokens", inference_request.max_tokens or model_service.max_tokens)
-        span.set_attribute("temperature", inference_request.temperature or model_service.temperature)
-        
-        try:
-            # Check cache first
-            with tracer.start_as_current_span("cache.get") as cache_span:
-                cached_result = await cache_service.get(
-                    prompt=inference_request.prompt,
-                    max_tokens=inference_request.max_tokens,
-                    temperature=inference_request.temperature
-                )
-                cache_span.set_attribute("cache.hit", cached_result is not None)
+    # Snapshot request fields and model identity once; they are read several times below
+    prompt = inference_request.prompt
+    max_tokens = inference_request.max_tokens
+    temperature = inference_request.temperature
+    model_name, model_version = model_service.model_name, model_service.model_version
+    
+    try:
+        # Single span for the whole request; cache/model steps are recorded as attributes
+        with _span("inference_request") as span:
+            if TRACING_ON:
+                span.set_attribute("prompt.length", len(prompt))
+                span.set_attribute("max_tokens", max_tokens or model_service.max_tokens)
+                span.set_attribute("temperature", temperature or model_service.temperature)
             
-            if cached_result:
-                # Cache hit - return cached result (much faster!)
-                metrics.record_cache_hit("inference")
-                span.set_attribute("cache.result", "hit")
-                duration = time.time() - start_time
-                
-                # Record metrics
-                metrics.record_request("POST", "/api/v1/infer", 200, duration)
-                metrics.record_inference(
-                    model_name=model_service.model_name,
-                    model_version=cached_result.get("model_version", "unknown"),
-                    duration=duration,
-                    tokens_used=cached_result["tokens_used"]
+            try:
+                # Hash the inputs once and reuse the key for both the read and the write
+                cache_key = cache_service.generate_cache_key(
+                    prompt=prompt,
+                    max_tokens=max_tokens,
+                    temperature=temperature
                 )
                 
-                span.set_attribute("tokens_used", cached_result["tokens_used"])
-                span.set_status(trace.Status(trace.StatusCode.OK))
+                # Check cache first
+                cached_result = await cache_service.get_by_key(cache_key)
                 
-                metrics.decrement_active_requests()
-                return InferenceResponse(
-                    output=cached_result["output"],
-                    tokens_used=cached_result["tokens_used"],
-                    model_version=cached_result["model_version"]
-                )
-            
-            # Cache miss - call model service
-            metrics.record_cache_miss("inference")
-            span.set_attribute("cache.result", "miss")
-            inference_start = time.time()
-            
-            # Create span for model inference
-            with tracer.start_as_current_span("model.predict") as model_span:
-                model_span.set_attribute("model.name", model_service.model_name)
-                model_span.set_attribute("model.version", model_service.model_version)
+                if cached_result:
+                    # Cache hit - return cached result (much faster!)
+                    metrics.record_cache_hit("inference")
+                    duration = time.perf_counter() - start
+                    
+                    # Record metrics
+                    metrics.record_inference_complete(
+                        "POST", "/api/v1/infer", 200, duration,
+                        model_name=model_name,
+                        model_version=cached_result.get("model_version", "unknown"),
+                        inference_seconds=duration,
+                        tokens_used=cached_result["tokens_used"]
+                    )
+                    
+                    if TRACING_ON:
+                        span.set_attribute("cache.result", "hit")
+                        span.set_attribute("tokens_used", cached_result["tokens_used"])
+                        span.set_status(trace.Status(trace.StatusCode.OK))
+                    
+                    return ORJSONResponse({
+                        "output": cached_result["output"],
+                        "tokens_used": cached_result["tokens_used"],
+                        "model_version": cached_result["model_version"]
+                    })
+                
+                # Cache miss - call model service
+                metrics.record_cache_miss("inference")
+                t_after_cache = time.perf_counter()
                 
                 result = await model_service.predict(
-                    prompt=inference_request.prompt,
-                    max_tokens=inference_request.max_tokens,
-                    temperature=inference_request.temperature
+                    prompt=prompt,
+                    max_tokens=max_tokens,
+                    temperature=temperature
                 )
                 
-                model_span.set_attribute("tokens_used", result["tokens_used"])
-            
-            inference_duration = time.time() - inference_start
-            
-            # Cache the result for future requests
-            with tracer.start_as_current_span("cache.set") as cache_set_span:
-                await cache_service.set(
-                    prompt=inference_request.prompt,
-                    result=result,
-                    max_tokens=inference_request.max_tokens,
-                    temperature=inference_request.temperature
+                t_after_model = time.perf_counter()
+                
+                # Cache the result for future requests
+                await cache_service.set_by_key(cache_key, result)
+                
+                # Record metrics
+                metrics.record_inference_complete(
+                    "POST", "/api/v1/infer", 200, time.perf_counter() - start,
+                    model_name=model_name,
+                    model_version=result.get("model_version", "unknown"),
+                    inference_seconds=t_after_model - t_after_cache,
+                    tokens_used=result["tokens_used"]
                 )
-        
-            total_duration = time.time() - start_time
-            
-            # Record metrics
-            metrics.record_request("POST", "/api/v1/infer", 200, total_duration)
-            metrics.record_inference(
-                model_name=model_service.model_name,
-                model_version=result.get("model_version", "unknown"),
-                duration=inference_duration,
-                tokens_used=result["tokens_used"]
-            )
-            
-            span.set_attribute("tokens_used", result["tokens_used"])
-            span.set_status(trace.Status(trace.StatusCode.OK))
-            
-            metrics.decrement_active_requests()
-            return InferenceResponse(
-                output=result["output"],
-                tokens_used=result["tokens_used"],
-                model_version=result["model_version"]
-            )
-            
-        except Exception as e:
-            # Record error in trace
-            span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
-            span.record_exception(e)
-            
-            # Record error metrics
-            metrics.record_error(str(type(e).__name__), "unknown")
-            duration = time.time() - start_time
-            metrics.record_request("POST", "/api/v1/infer", 500, duration)
-            metrics.decrement_active_requests()
-            raise
+                
+                if TRACING_ON:
+                    span.set_attribute("cache.result", "miss")
+                    span.set_attribute("model.name", model_name)
+                    span.set_attribute("model.version", model_version)
+                    span.set_attribute("tokens_used", result["tokens_used"])
+                    span.set_status(trace.Status(trace.StatusCode.OK))
+                
+                return ORJSONResponse({
+                    "output": result["output"],
+                    "tokens_used": result["tokens_used"],
+                    "model_version": result["model_version"]
+                })
+                
+            except Exception as e:
+                # Record error in trace
+                if TRACING_ON:
+                    span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
+                    span.record_exception(e)
+                
+                # Record error metrics
+                metrics.record_error(str(type(e).__name__), "unknown")
+                metrics.record_request("POST", "/api/v1/infer", 500, time.perf_counter() - start)
+                raise
+    finally:
+        # Always balance the gauge, whichever way the request ends
+        metrics.decrement_active_requests()
 
 
-@router.get("/model", response_model=ModelInfoResponse)
+@router.get("/model", responses={200: {"model": ModelInfoResponse}})
 async def get_model_info(request: Request):
     """
     Get information about the current model.
@@ -181,25 +227,29 @@ async def get_model_info(request: Request):
     Returns:
         ModelInfoResponse with model details
     """
-    start_time = time.time()
+    start = time.perf_counter()
     metrics.increment_active_requests()
     
     try:
-        # Get model info from model service
-        info = model_service.get_info()
+        # The model info only changes if the model itself changes,
+        # so serialize it once per (name, version, status)
+        info_key = (model_service.model_name, model_service.model_version, model_service.status)
+        body = _model_info_bodies.get(info_key)
+        if body is None:
+            info = model_service.get_info()
+            body = orjson.dumps({
+                "model_name": info["model_name"],
+                "model_version": info["model_version"],
+                "status": info["status"],
+                "description": info["description"]
+            })
+            _model_info_bodies[info_key] = body
         
-        duration = time.time() - start_time
-        metrics.record_request("GET", "/api/v1/model", 200, duration)
-        metrics.decrement_active_requests()
+        metrics.record_request("GET", "/api/v1/model", 200, time.perf_counter() - start)
         
-        return ModelInfoResponse(
-            model_name=info["model_name"],
-            model_version=info["model_version"],
-            status=info["status"],
-            description=info["description"]
-        )
+        return Response(content=body, media_type="application/json")
     except Exception as e:
-        duration = time.time() - start_time
-        metrics.record_request("GET", "/api/v1/model", 500, duration)
-        metrics.decrement_active_requests()
+        metrics.record_request("GET", "/api/v1/model", 500, time.perf_counter() - start)
         raise
+    finally:
+        metrics.decrement_active_requests()
@@ -5,6 +5,7 @@ This module handles all configuration using pydantic-settings.
 It loads settings from environment variables and .env files.
 """
 
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
@@ -32,22 +33,39 @@ class Settings(BaseSettings):
     # Redis Configuration
     redis_url: str = "redis://127.0.0.1:6379/0"  # Use 127.0.0.1 instead of localhost for Docker on Windows
     redis_ttl: int = 60  # Cache TTL in seconds
+    redis_pool_size: int = 32  # Max open Redis connections per process
+    redis_pool_timeout: float = 1.0  # Seconds to wait for a free pooled connection
+    local_cache_size: int = 1024  # Entries kept in the in-process cache in front of Redis (0 disables it)
     
     # Rate Limiting
     rate_limit_enabled: bool = True
     rate_limit_per_minute: int = 10
     rate_limit_per_hour: int = 100
+    rate_limit_max_clients: int = 10000  # Client buckets kept in memory
+    rate_limit_backend: str = "memory"  # memory (per process) or redis (shared across pods)
     
     # OpenTelemetry (Tracing)
     otel_enabled: bool = True
     otel_exporter_otlp_endpoint: Optional[str] = None  # e.g., "http://localhost:4317"
     otel_service_name: str = "ai-inference-platform"
+    # Span batching (same names as the standard OTEL_BSP_* variables)
+    otel_bsp_max_queue_size: int = 4096  # Spans buffered before new ones are dropped
+    otel_bsp_max_export_batch_size: int = 512  # Spans per export request
+    otel_bsp_schedule_delay_millis: int = 2000  # Flush interval; shorter keeps each flush small
+    otel_bsp_export_timeout_millis: int = 5000  # Give up on a slow collector after this
+    
+    # Prometheus Metrics
+    # Fraction of requests whose histogram observations are recorded (0 drops them)
+    metrics_sample_rate: float = Field(default=1.0, ge=0.0, le=1.0)
     
     # Model Configuration
     model_name: str = "default-model"
     model_version: str = "1.0.0"
     model_max_tokens: int = 1000
     model_temperature: float = 0.7
+    model_workers: int = 4  # Threads running blocking model inference
+    model_batch_size: int = 1  # Max prompts per batched model call (1 disables micro-batching)
+    model_batch_wait_ms: float = 5.0  # Max time to wait for a batch to fill
     
     # Logging
     log_level: str = "INFO"  # DEBUG, INFO, WARNING, ERROR
@@ -5,18 +5,21 @@ This is the main entry point for the AI Inference Platform.
 It initializes the FastAPI app, wires routers, and sets up middleware.
 """
 
+import asyncio
 import logging
+import orjson
+from contextlib import asynccontextmanager
+from typing import Optional
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from starlette.responses import Response
 
 from app.api.v1 import routes as v1_routes
 from app.services.cache import cache_service
-from app.services.rate_limit import limiter, rate_limit_exceeded_handler
+from app.services.model import model_service
+from app.services.rate_limit import create_rate_limiter
 from app.observability.tracing import setup_tracing
-from app.core.config import settings
-from slowapi.errors import RateLimitExceeded
+from app.core.config import Settings, settings
 
 # Configure logging
 logging.basicConfig(
@@ -27,27 +30,8 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="AI Inference Platform",
-    description="Production-grade AI inference service with observability",
-    version="1.0.0",
-)
-
-# Set up OpenTelemetry tracing
-setup_tracing(app)
-
-# Add rate limiter to the app
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
-
-# Include API routers
-app.include_router(v1_routes.router, prefix="/api/v1", tags=["v1"])
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize services on application startup."""
+async def connect_cache():
+    """Connect the cache service to Redis without failing startup."""
     # Skip Redis connection if already connected (e.g., in tests with mock)
     if cache_service._connected and cache_service.redis_client is not None:
         return
@@ -66,48 +50,114 @@ async def startup_event():
             cache_service._connected = False
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup on application shutdown."""
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: start services before serving, release them after.
+    
+    Redis connection and model warm-up are independent, so they run
+    concurrently to shorten cold starts (e.g., during rolling updates).
+    
+    In the test environment this is a no-op: Redis is mocked and tests
+    don't need a warmed-up model or the batching loop.
+    """
+    if app.state.settings.environment == "test":
+        yield
+        return
+    
+    await asyncio.gather(connect_cache(), model_service.warmup())
+    
+    # Start coalescing concurrent predictions (no-op unless MODEL_BATCH_SIZE > 1)
+    model_service.start_batching()
+    
+    yield
+    
     # Disconnect from Redis (only if connected)
     if cache_service._connected:
         try:
             await cache_service.disconnect()
         except Exception as e:
             logger.warning(f"Error disconnecting from Redis: {e}")
+    
+    # Stop micro-batching and the model worker pool
+    await model_service.stop_batching()
+    model_service.shutdown()
 
 
-@app.get("/health")
-async def health_check():
-    """
-    Health check endpoint for Kubernetes liveness/readiness probes.
-    
-    Returns:
-        JSON response with status "healthy"
-    """
-    return JSONResponse(content={"status": "healthy"})
+# Constant response bodies, serialized once at import
+# (Kubernetes probes hit /health every few seconds)
+_HEALTH_BODY = orjson.dumps({"status": "healthy"})
+_ROOT_BODY = orjson.dumps({
+    "service": "AI Inference Platform",
+    "version": "1.0.0",
+    "docs": "/docs"
+})
 
 
-@app.get("/metrics")
-async def metrics():
+def create_app(app_settings: Optional[Settings] = None) -> FastAPI:
     """
-    Prometheus metrics endpoint.
+    Build the FastAPI application.
     
-    Kubernetes scrapes this endpoint to collect metrics.
-    Returns metrics in Prometheus text format.
+    Per-app dependencies (currently the rate limiter) are created here from
+    the given settings and stored on app.state, so tests can build an app
+    with their own limits instead of mutating global settings.
+    
+    Args:
+        app_settings: Settings for this app (defaults to the global settings)
+        
+    Returns:
+        Configured FastAPI application
     """
-    return Response(
-        content=generate_latest(),
-        media_type=CONTENT_TYPE_LATEST
+    app_settings = app_settings or settings
+    
+    # Initialize FastAPI app
+    app = FastAPI(
+        title="AI Inference Platform",
+        description="Production-grade AI inference service with observability",
+        version="1.0.0",
+        lifespan=lifespan,
     )
+    
+    app.state.settings = app_settings
+    
+    # Rate limiter used by the API routes (None when rate limiting is disabled)
+    app.state.rate_limiter = create_rate_limiter(app_settings)
+    
+    # Set up OpenTelemetry tracing
+    setup_tracing(app)
+    
+    # Include API routers
+    app.include_router(v1_routes.router, prefix="/api/v1", tags=["v1"])
+    
+    @app.get("/health")
+    async def health_check():
+        """
+        Health check endpoint for Kubernetes liveness/readiness probes.
+        
+        Returns:
+            JSON response with status "healthy"
+        """
+        return Response(content=_HEALTH_BODY, media_type="application/json")
+    
+    @app.get("/metrics")
+    async def metrics():
+        """
+        Prometheus metrics endpoint.
+        
+        Kubernetes scrapes this endpoint to collect metrics.
+        Returns metrics in Prometheus text format.
+        """
+        return Response(
+            content=generate_latest(),
+            media_type=CONTENT_TYPE_LATEST
+        )
+    
+    @app.get("/")
+    async def root():
+        """Root endpoint with API information."""
+        return Response(content=_ROOT_BODY, media_type="application/json")
+    
+    return app
 
 
-@app.get("/")
-async def root():
-    """Root endpoint with API information."""
-    return {
-        "service": "AI Inference Platform",
-        "version": "1.0.0",
-        "docs": "/docs"
-    }
-
+app = create_app()
@@ -6,7 +6,9 @@ Metrics track request counts, latency, cache performance, and errors.
 """
 
 from prometheus_client import Counter, Histogram, Gauge
-from typing import Optional
+from app.core.config import settings
+from typing import Dict, Optional, Tuple
+import itertools
 import time
 
 # Request Metrics
@@ -71,6 +73,74 @@ active_requests = Gauge(
 )
 
 
+# Pre-bound label children
+# labels() takes a lock and does a dict lookup on every call, so the fixed
+# label sets used by the API routes are resolved once at import time.
+_KNOWN_REQUESTS = [
+    ("POST", "/api/v1/infer", 200),
+    ("POST", "/api/v1/infer", 500),
+    ("GET", "/api/v1/model", 200),
+    ("GET", "/api/v1/model", 500),
+]
+
+_request_count_children = {
+    key: request_count.labels(*key) for key in _KNOWN_REQUESTS
+}
+
+_request_duration_children = {
+    (method, endpoint): request_duration.labels(method, endpoint)
+    for method, endpoint, _ in _KNOWN_REQUESTS
+}
+
+_cache_hit_children = {"inference": cache_hits.labels(cache_type="inference")}
+_cache_miss_children = {"inference": cache_misses.labels(cache_type="inference")}
+
+# Inference children per (model_name, model_version), resolved on first use
+_inference_children: Dict[Tuple[str, str], tuple] = {}
+
+
+def _request_children(method: str, endpoint: str, status_code: int):
+    """Return the (count, duration) children for a request label set."""
+    count_child = _request_count_children.get((method, endpoint, status_code))
+    if count_child is None:
+        count_child = request_count.labels(method=method, endpoint=endpoint, status_code=status_code)
+    
+    duration_child = _request_duration_children.get((method, endpoint))
+    if duration_child is None:
+        duration_child = request_duration.labels(method=method, endpoint=endpoint)
+    
+    return count_child, duration_child
+
+
+def _model_children(model_name: str, model_version: str):
+    """Return the (requests, duration, tokens) inference children for a model."""
+    children = _inference_children.get((model_name, model_version))
+    if children is None:
+        children = (
+            inference_requests.labels(model_name=model_name, model_version=model_version),
+            inference_duration.labels(model_name=model_name),
+            inference_tokens.labels(model_name=model_name),
+        )
+        _inference_children[(model_name, model_version)] = children
+    return children
+
+
+# Histogram sampling
+# With METRICS_SAMPLE_RATE < 1, only every Nth histogram observation is
+# recorded; counters are always incremented. A modulo on a running count is
+# cheaper than a random draw and gives an even spread.
+# METRICS_SAMPLE_RATE=0 drops histogram observations entirely (_SAMPLE_EVERY = 0).
+_SAMPLE_EVERY = max(1, round(1 / settings.metrics_sample_rate)) if settings.metrics_sample_rate > 0 else 0
+_observation_count = itertools.count()
+
+
+def _should_observe() -> bool:
+    """Return True if this histogram observation should be recorded."""
+    if _SAMPLE_EVERY == 1:
+        return True
+    return _SAMPLE_EVERY != 0 and next(_observation_count) % _SAMPLE_EVERY == 0
+
+
 class MetricsCollector:
     """
     Helper class for collecting metrics.
@@ -88,18 +158,26 @@ class MetricsCollector:
             status_code: HTTP status code
             duration: Request duration in seconds
         """
-        request_count.labels(method=method, endpoint=endpoint, status_code=status_code).inc()
-        request_duration.labels(method=method, endpoint=endpoint).observe(duration)
+        count_child, duration_child = _request_children(method, endpoint, status_code)
+        count_child.inc()
+        if _should_observe():
+            duration_child.observe(duration)
     
     @staticmethod
     def record_cache_hit(cache_type: str = "inference"):
         """Record a cache hit."""
-        cache_hits.labels(cache_type=cache_type).inc()
+        child = _cache_hit_children.get(cache_type)
+        if child is None:
+            child = cache_hits.labels(cache_type=cache_type)
+        child.inc()
     
     @staticmethod
     def record_cache_miss(cache_type: str = "inference"):
         """Record a cache miss."""
-        cache_misses.labels(cache_type=cache_type).inc()
+        child = _cache_miss_children.get(cache_type)
+        if child is None:
+            child = cache_misses.labels(cache_type=cache_type)
+        child.inc()
     
     @staticmethod
     def record_inference(
@@ -117,9 +195,48 @@ class MetricsCollector:
             duration: Inference duration in seconds
             tokens_used: Number of tokens used
         """
-        inference_requests.labels(model_name=model_name, model_version=model_version).inc()
-        inference_duration.labels(model_name=model_name).observe(duration)
-        inference_tokens.labels(model_name=model_name).observe(tokens_used)
+        requests_child, duration_child, tokens_child = _model_children(model_name, model_version)
+        requests_child.inc()
+        if _should_observe():
+            duration_child.observe(duration)
+            tokens_child.observe(tokens_used)
+    
+    @staticmethod
+    def record_inference_complete(
+        method: str,
+        endpoint: str,
+        status_code: int,
+        request_seconds: float,
+        model_name: str,
+        model_version: str,
+        inference_seconds: float,
+        tokens_used: int
+    ):
+        """
+        Record request and inference metrics for a completed inference in one call.
+        
+        Equivalent to record_request() followed by record_inference(), but
+        resolves all label children and makes a single sampling decision.
+        
+        Args:
+            method: HTTP method (GET, POST, etc.)
+            endpoint: API endpoint path
+            status_code: HTTP status code
+            request_seconds: Total request duration in seconds
+            model_name: Name of the model used
+            model_version: Version of the model
+            inference_seconds: Inference duration in seconds
+            tokens_used: Number of tokens used
+        """
+        request_count_child, request_duration_child = _request_children(method, endpoint, status_code)
+        requests_child, duration_child, tokens_child = _model_children(model_name, model_version)
+        
+        request_count_child.inc()
+        requests_child.inc()
+        if _should_observe():
+            request_duration_child.observe(request_seconds)
+            duration_child.observe(inference_seconds)
+            tokens_child.observe(tokens_used)
     
     @staticmethod
     def record_error(error_type: str, model_name: str = "unknown"):
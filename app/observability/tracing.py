@@ -6,24 +6,91 @@ Tracing helps track requests as they flow through the system.
 """
 
 from opentelemetry import trace
+from opentelemetry.propagate import extract
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.instrumentation.requests import RequestsInstrumentor
 from app.core.config import settings
+import functools
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Module-level flag so hot paths can skip span work with a single check
+TRACING_ON = settings.otel_enabled
+
+# Global tracer provider; created once even if several apps are built
+_tracer_provider = None
+
+# Incoming headers that carry trace context (W3C tracecontext + baggage)
+_PROPAGATION_HEADERS = {b"traceparent", b"tracestate", b"baggage"}
+
+
+class MinimalTracingMiddleware:
+    """
+    Lightweight ASGI middleware that creates one server span per HTTP request.
+    
+    Replaces the FastAPI/requests auto-instrumentation, which wraps every
+    ASGI send/receive in extra spans. The tracer's sampler runs before the
+    span is built, so dropped requests only get a non-recording span, and
+    attributes are set only when the span is actually recorded.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self.tracer = trace.get_tracer(__name__)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Continue the caller's trace if it sent trace context headers
+        carrier = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope["headers"]
+            if name in _PROPAGATION_HEADERS
+        }
+        context = extract(carrier) if carrier else None
+        
+        method = scope["method"]
+        with self.tracer.start_as_current_span(method, context=context, kind=trace.SpanKind.SERVER) as span:
+            if not span.is_recording():
+                await self.app(scope, receive, send)
+                return
+            
+            status_code = 500
+            
+            async def send_wrapper(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                await send(message)
+            
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # The router stores the matched route in the scope; use its
+                # template (e.g. /api/v1/infer) to keep span names low-cardinality
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.update_name(f"{method} {route}")
+                    span.set_attribute("http.route", route)
+                span.set_attribute("http.method", method)
+                span.set_attribute("http.status_code", status_code)
+                if status_code >= 500:
+                    span.set_status(trace.Status(trace.StatusCode.ERROR))
+
 
 def setup_tracing(app=None):
     """
     Set up OpenTelemetry tracing.
     
-    This function initializes tracing and instruments FastAPI and requests.
+    This function initializes tracing and adds MinimalTracingMiddleware to the app.
     If OTLP endpoint is not configured, tracing is set up but traces won't be exported.
+    The global tracer provider is only created on the first call, so it is
+    safe to call once per app (e.g. for apps built by create_app in tests).
     
     Args:
         app: FastAPI application instance (optional, for instrumentation)
@@ -32,46 +99,68 @@ def setup_tracing(app=None):
         logger.info("OpenTelemetry tracing is disabled")
         return
     
+    global _tracer_provider
+    
     try:
-        # Create resource with service information
-        resource = Resource.create({
-            "service.name": settings.otel_service_name,
-            "service.version": settings.service_version,
-            "service.namespace": settings.environment,
-        })
+        if _tracer_provider is None:
+            _tracer_provider = _create_tracer_provider()
         
-        # Create tracer provider
-        tracer_provider = TracerProvider(resource=resource)
-        trace.set_tracer_provider(tracer_provider)
-        
-        # Set up OTLP exporter if endpoint is configured
-        if settings.otel_exporter_otlp_endpoint:
-            otlp_exporter = OTLPSpanExporter(
-                endpoint=settings.otel_exporter_otlp_endpoint,
-            )
-            span_processor = BatchSpanProcessor(otlp_exporter)
-            tracer_provider.add_span_processor(span_processor)
-            logger.info(f"OpenTelemetry tracing enabled with OTLP endpoint: {settings.otel_exporter_otlp_endpoint}")
-        else:
-            logger.info("OpenTelemetry tracing enabled (no OTLP endpoint configured - traces not exported)")
-        
-        # Instrument FastAPI if app is provided
+        # Trace incoming requests if app is provided
         if app:
-            FastAPIInstrumentor.instrument_app(app)
-            logger.info("FastAPI instrumentation enabled")
-        
-        # Instrument requests library
-        RequestsInstrumentor().instrument()
-        logger.info("Requests library instrumentation enabled")
+            app.add_middleware(MinimalTracingMiddleware)
+            logger.info("Request tracing middleware enabled")
         
     except Exception as e:
         logger.warning(f"Failed to set up OpenTelemetry tracing: {e}. Tracing disabled.")
 
 
+def _create_tracer_provider() -> TracerProvider:
+    """Create and register the global tracer provider (with OTLP export if configured)."""
+    # Create resource with service information
+    resource = Resource.create({
+        "service.name": settings.otel_service_name,
+        "service.version": settings.service_version,
+        "service.namespace": settings.environment,
+    })
+    
+    # Create tracer provider
+    tracer_provider = TracerProvider(resource=resource)
+    trace.set_tracer_provider(tracer_provider)
+    
+    # Set up OTLP exporter if endpoint is configured
+    if settings.otel_exporter_otlp_endpoint:
+        otlp_exporter = OTLPSpanExporter(
+            endpoint=settings.otel_exporter_otlp_endpoint,
+        )
+        # Larger queue + shorter delay absorbs bursts without large, loop-stalling flushes.
+        # Exports run on the processor's own background thread over a keep-alive HTTP session.
+        span_processor = BatchSpanProcessor(
+            otlp_exporter,
+            max_queue_size=settings.otel_bsp_max_queue_size,
+            max_export_batch_size=settings.otel_bsp_max_export_batch_size,
+            schedule_delay_millis=settings.otel_bsp_schedule_delay_millis,
+            export_timeout_millis=settings.otel_bsp_export_timeout_millis,
+        )
+        tracer_provider.add_span_processor(span_processor)
+        logger.info(f"OpenTelemetry tracing enabled with OTLP endpoint: {settings.otel_exporter_otlp_endpoint}")
+    else:
+        logger.info("OpenTelemetry tracing enabled (no OTLP endpoint configured - traces not exported)")
+    
+    return tracer_provider
+
+
+# Shared no-op tracer, so callers can compare identity (tracer is _NOOP_TRACER)
+_NOOP_TRACER = trace.NoOpTracer()
+
+
+@functools.lru_cache(maxsize=None)
 def get_tracer(name: str = None):
     """
     Get a tracer instance for creating spans.
     
+    Tracers are cached per name; when tracing is disabled every caller
+    gets the same shared no-op tracer.
+    
     Args:
         name: Name of the tracer (usually module name)
         
@@ -80,7 +169,6 @@ def get_tracer(name: str = None):
     """
     if not settings.otel_enabled:
         # Return a no-op tracer if tracing is disabled
-        return trace.NoOpTracer()
+        return _NOOP_TRACER
     
     return trace.get_tracer(name or __name__)
-
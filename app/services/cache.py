@@ -7,9 +7,10 @@ Caching improves performance by storing results of previous requests.
 
 from app.core.config import settings
 from typing import Optional, Dict, Any
+from cachetools import TTLCache
 import redis.asyncio as redis
-import hashlib
-import json
+import xxhash
+import orjson
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,14 +22,28 @@ class CacheService:
     
     Caches responses by creating a hash of the input (prompt + parameters).
     This allows us to return cached results for identical requests.
+    
+    A small in-process TTL cache sits in front of Redis and holds already
+    deserialized results, so hot prompts are served without a network
+    round-trip. Entries may outlive the Redis key by up to one TTL.
     """
     
+    KEY_PREFIX = "inference:"
+    # Prompts shorter than this (in characters) are embedded in the key instead of hashed
+    SHORT_PROMPT_LIMIT = 32
+    
     def __init__(self):
         """Initialize the cache service with Redis connection."""
         self.redis_url = settings.redis_url
         self.ttl = settings.redis_ttl  # Time To Live in seconds
         self.redis_client: Optional[redis.Redis] = None
         self._connected = False
+        # Process-local cache of deserialized results (safe without locks on a single event loop);
+        # LOCAL_CACHE_SIZE=0 turns it off
+        self._local: Optional[TTLCache] = (
+            TTLCache(maxsize=settings.local_cache_size, ttl=self.ttl)
+            if settings.local_cache_size > 0 else None
+        )
     
     async def connect(self):
         """
@@ -53,19 +68,29 @@ class CacheService:
         
         for attempt in range(max_retries):
             try:
-                # Use simple connection parameters to avoid recursion issues
-                self.redis_client = redis.from_url(
+                # Bounded pool: caps open sockets and makes bursts wait
+                # (up to pool_timeout) for a free connection instead of opening new ones.
+                # Values are orjson bytes, so keep the client in bytes mode
+                pool = redis.BlockingConnectionPool.from_url(
                     self.redis_url,
-                    encoding="utf-8",
-                    decode_responses=True,
-                    socket_connect_timeout=5
+                    max_connections=settings.redis_pool_size,
+                    timeout=settings.redis_pool_timeout,
+                    decode_responses=False,
+                    socket_connect_timeout=5,
+                    socket_keepalive=True
                 )
+                # from_pool() hands pool ownership to the client, so close() also closes the pool
+                self.redis_client = redis.Redis.from_pool(pool)
                 # Test connection
                 await self.redis_client.ping()
                 self._connected = True
                 logger.info(f"Connected to Redis at {self.redis_url}")
                 return
             except Exception as e:
+                # Release this attempt's pool before retrying
+                if self.redis_client is not None:
+                    await self.redis_client.close()
+                    self.redis_client = None
                 if attempt < max_retries - 1:
                     logger.warning(f"Failed to connect to Redis (attempt {attempt + 1}/{max_retries}): {e}. Retrying in {retry_delay}s...")
                     await asyncio.sleep(retry_delay)
@@ -80,11 +105,20 @@ class CacheService:
             self._connected = False
             logger.info("Disconnected from Redis")
     
-    def _generate_cache_key(self, prompt: str, max_tokens: int = None, temperature: float = None) -> str:
+    def generate_cache_key(self, prompt: str, max_tokens: int = None, temperature: float = None) -> str:
         """
         Generate a unique cache key from the input parameters.
         
-        Uses SHA256 hash to create a unique key for each unique input combination.
+        Uses a 128-bit xxh3 hash over the prompt and parameters. The key only
+        needs to be unique, not cryptographically secure, and xxh3 is much
+        cheaper than SHA256 on the request path.
+        
+        Short prompts (common for chat turns) skip hashing entirely: the
+        parameters and the prompt itself form the key, which stays bounded in
+        length and cannot collide with hashed keys thanks to the "s:" marker.
+        
+        Callers that need both a read and a write for the same request should
+        compute the key once and use get_by_key()/set_by_key().
         
         Args:
             prompt: Input text
@@ -94,22 +128,15 @@ class CacheService:
         Returns:
             Cache key string (e.g., "inference:abc123...")
         """
-        # Create a dictionary with all parameters
-        cache_data = {
-            "prompt": prompt,
-            "max_tokens": max_tokens,
-            "temperature": temperature
-        }
-        
-        # Convert to JSON string (consistent format)
-        cache_string = json.dumps(cache_data, sort_keys=True)
+        if len(prompt) < self.SHORT_PROMPT_LIMIT:
+            # Parameters go first: they never contain ":", so the key stays unambiguous
+            return f"{self.KEY_PREFIX}s:{max_tokens or 0}:{temperature or 0.0!r}:{prompt}"
         
-        # Generate SHA256 hash
-        hash_object = hashlib.sha256(cache_string.encode())
-        hash_hex = hash_object.hexdigest()
+        # Pack parameters directly instead of building and JSON-encoding a dict
+        key_bytes = b"%b|%d|%a" % (prompt.encode("utf-8"), max_tokens or 0, temperature or 0.0)
         
         # Return cache key with prefix
-        return f"inference:{hash_hex}"
+        return self.KEY_PREFIX + xxhash.xxh3_128_hexdigest(key_bytes)
     
     async def get(self, prompt: str, max_tokens: int = None, temperature: float = None) -> Optional[Dict[str, Any]]:
         """
@@ -120,28 +147,46 @@ class CacheService:
             max_tokens: Maximum tokens parameter
             temperature: Temperature parameter
             
+        Returns:
+            Cached result dictionary if found, None otherwise
+        """
+        return await self.get_by_key(self.generate_cache_key(prompt, max_tokens, temperature))
+    
+    async def get_by_key(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve cached inference result using a precomputed key.
+        
+        Args:
+            cache_key: Key returned by generate_cache_key()
+            
         Returns:
             Cached result dictionary if found, None otherwise
         """
         if not self._connected:
             return None
         
+        if self._local is not None:
+            result = self._local.get(cache_key)
+            if result is not None:
+                return result
+        
         try:
-            cache_key = self._generate_cache_key(prompt, max_tokens, temperature)
             cached_value = await self.redis_client.get(cache_key)
             
-            if cached_value:
-                # Deserialize JSON string back to dictionary
-                result = json.loads(cached_value)
-                logger.info(f"Cache HIT for key: {cache_key[:20]}...")
-                return result
-            else:
+            if not cached_value:
                 logger.info(f"Cache MISS for key: {cache_key[:20]}...")
                 return None
+            
+            # Deserialize JSON bytes back to dictionary
+            result = orjson.loads(cached_value)
                 
         except Exception as e:
             logger.error(f"Error reading from cache: {e}")
             return None
+        
+        logger.info(f"Cache HIT for key: {cache_key[:20]}...")
+        self._store_local(cache_key, result)
+        return result
     
     async def set(self, prompt: str, result: Dict[str, Any], max_tokens: int = None, temperature: float = None):
         """
@@ -153,24 +198,64 @@ class CacheService:
             max_tokens: Maximum tokens parameter
             temperature: Temperature parameter
         """
+        await self.set_by_key(self.generate_cache_key(prompt, max_tokens, temperature), result)
+    
+    async def set_by_key(self, cache_key: str, result: Dict[str, Any]):
+        """
+        Store inference result in cache using a precomputed key.
+        
+        Args:
+            cache_key: Key returned by generate_cache_key()
+            result: Inference result dictionary to cache
+        """
         if not self._connected:
             return
         
         try:
-            cache_key = self._generate_cache_key(prompt, max_tokens, temperature)
-            # Serialize dictionary to JSON string
-            cache_value = json.dumps(result)
-            
-            # Store in Redis with TTL (Time To Live)
-            await self.redis_client.setex(
-                cache_key,
-                self.ttl,  # Expire after TTL seconds
-                cache_value
-            )
-            logger.info(f"Cached result for key: {cache_key[:20]}... (TTL: {self.ttl}s)")
+            # Serialize dictionary straight to JSON bytes
+            cache_value = orjson.dumps(result)
+            stored = await self.set_nx(cache_key, cache_value, self.ttl)
             
         except Exception as e:
             logger.error(f"Error writing to cache: {e}")
+            return
+        
+        if stored:
+            self._store_local(cache_key, result)
+            logger.info(f"Cached result for key: {cache_key[:20]}... (TTL: {self.ttl}s)")
+    
+    def _store_local(self, cache_key: str, result: Dict[str, Any]):
+        """
+        Remember a result in the process-local cache (if enabled).
+        
+        Kept separate from the Redis calls, so a local-cache failure never
+        turns a Redis hit into a miss.
+        """
+        if self._local is None:
+            return
+        try:
+            self._local[cache_key] = result
+        except ValueError as e:
+            # cachetools raises ValueError for entries larger than maxsize
+            logger.warning(f"Could not store key in local cache: {e}")
+    
+    async def set_nx(self, cache_key: str, value: bytes, ttl: int) -> bool:
+        """
+        Store a value only if the key does not exist yet.
+        
+        Uses a single SET ... EX ... NX command, so the write and its expiry
+        happen in one round-trip. If a concurrent request already cached the
+        same key, the existing entry is kept.
+        
+        Args:
+            cache_key: Redis key
+            value: Serialized value to store
+            ttl: Expiry in seconds
+            
+        Returns:
+            True if the value was written, False if the key already existed
+        """
+        return bool(await self.redis_client.set(cache_key, value, ex=ttl, nx=True))
 
 
 # Create a global cache service instance
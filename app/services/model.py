@@ -7,8 +7,13 @@ Can be replaced with real models (HuggingFace, OpenAI, etc.) later.
 """
 
 from app.core.config import settings
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 
 class ModelService:
@@ -17,6 +22,14 @@ class ModelService:
     
     This is a placeholder implementation that simulates model behavior.
     In production, this would load and run actual ML models.
+    
+    Inference runs on a bounded thread pool so blocking, CPU-bound model
+    calls never stall the event loop.
+    
+    When model_batch_size > 1, concurrent predict() calls are coalesced by a
+    background task into batches of up to batch_size prompts, waiting at most
+    batch_wait_ms for a batch to fill. Only enable this for models that
+    actually benefit from batched forward passes.
     """
     
     def __init__(self):
@@ -26,6 +39,27 @@ class ModelService:
         self.max_tokens = settings.model_max_tokens
         self.temperature = settings.model_temperature
         self.status = "ready"
+        self._pool = ThreadPoolExecutor(
+            max_workers=settings.model_workers,
+            thread_name_prefix="model-worker"
+        )
+        
+        # Micro-batching (disabled when batch_size is 1)
+        self.batch_size = settings.model_batch_size
+        self.batch_wait = settings.model_batch_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        
+    async def warmup(self):
+        """
+        Warm up the model before serving traffic (called on application startup).
+        
+        Runs one small prediction on the worker pool, so the first real
+        request does not pay for thread start-up or lazy model initialization.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._pool, self._predict_sync, "warmup", 1, self.temperature)
+        logger.info(f"Model {self.model_name} v{self.model_version} warmed up")
         
     def get_info(self) -> Dict[str, Any]:
         """
@@ -62,9 +96,51 @@ class ModelService:
         max_tokens = max_tokens or self.max_tokens
         temperature = temperature or self.temperature
         
+        loop = asyncio.get_running_loop()
+        
+        if self._queue is None:
+            # Single-item path: run the blocking model call off the event loop
+            return await loop.run_in_executor(self._pool, self._predict_sync, prompt, max_tokens, temperature)
+        
+        # Batched path: hand the request to the batcher and wait for its result
+        future = loop.create_future()
+        self._queue.put_nowait((prompt, max_tokens, temperature, future))
+        return await future
+    
+    def _predict_sync(self, prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        """
+        Run model inference synchronously (called on the worker pool).
+        
+        Args:
+            prompt: Input text for inference
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            
+        Returns:
+            Dictionary with output, tokens_used, and metadata
+        """
         # Simulate model processing time (real models take time to process)
-        await asyncio.sleep(0.1)  # Simulate 100ms processing time
+        time.sleep(0.1)  # Simulate 100ms processing time
+        
+        return self._generate(prompt, max_tokens, temperature)
+    
+    def _predict_batch(self, items: List[Tuple[str, int, float]]) -> List[Dict[str, Any]]:
+        """
+        Run model inference for a batch of prompts (called on the worker pool).
+        
+        Args:
+            items: List of (prompt, max_tokens, temperature) tuples
+            
+        Returns:
+            List of result dictionaries, in the same order as items
+        """
+        # Simulate a single batched forward pass for the whole batch
+        time.sleep(0.1)
         
+        return [self._generate(prompt, max_tokens, temperature) for prompt, max_tokens, temperature in items]
+    
+    def _generate(self, prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        """Build the placeholder model output for a single prompt."""
         # Simulate token counting (rough estimate: ~4 characters per token)
         estimated_tokens = len(prompt) // 4
         generated_tokens = min(max_tokens, estimated_tokens + 10)
@@ -82,6 +158,98 @@ class ModelService:
             "model_version": self.model_version,
             "model_name": self.model_name
         }
+    
+    def start_batching(self):
+        """
+        Start the micro-batching task (called on application startup).
+        
+        Does nothing when batch_size is 1 or the task is already running.
+        Must be called from within the running event loop.
+        """
+        if self.batch_size <= 1 or self._batcher is not None:
+            return
+        
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batch_loop())
+        logger.info(f"Model micro-batching enabled (batch_size={self.batch_size}, wait={self.batch_wait * 1000:.1f}ms)")
+    
+    async def stop_batching(self):
+        """Stop the micro-batching task (called on application shutdown)."""
+        if self._batcher is None:
+            return
+        
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        
+        # Fail anything still queued so callers don't wait forever
+        # (the in-flight batch is failed by _batch_loop when it is cancelled)
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._fail_pending(pending, RuntimeError("Model service is shutting down"))
+        
+        self._batcher = None
+        self._queue = None
+    
+    @staticmethod
+    def _fail_pending(batch: List[tuple], error: Exception):
+        """Set error on every future in batch that has not been resolved yet."""
+        for *_, future in batch:
+            if not future.done():
+                future.set_exception(error)
+    
+    async def _batch_loop(self):
+        """Collect queued requests into batches and run them on the worker pool."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = []
+            try:
+                # Block until at least one request arrives, then wait briefly for more
+                batch.append(await self._queue.get())
+                deadline = loop.time() + self.batch_wait
+                
+                while len(batch) < self.batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        async with asyncio.timeout(remaining):
+                            batch.append(await self._queue.get())
+                    except TimeoutError:
+                        break
+                
+                # Skip requests whose callers already went away
+                batch = [item for item in batch if not item[3].done()]
+                if not batch:
+                    continue
+                
+                try:
+                    results = await loop.run_in_executor(
+                        self._pool, self._predict_batch, [item[:3] for item in batch]
+                    )
+                except Exception as e:
+                    self._fail_pending(batch, e)
+                    continue
+                
+                for (*_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+                
+                # A short result list must not leave the remaining callers hanging
+                self._fail_pending(batch, RuntimeError("Model returned fewer results than requests"))
+            
+            except asyncio.CancelledError:
+                # Shutdown: fail the batch being collected or run, which is no longer queued
+                self._fail_pending(batch, RuntimeError("Model service is shutting down"))
+                raise
+    
+    def shutdown(self):
+        """Stop the worker pool (called on application shutdown)."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
 
 
 # Create a global model service instance
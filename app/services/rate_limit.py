@@ -1,21 +1,210 @@
 """
 Rate Limiting Service
 
-This module handles rate limiting using slowapi.
+This module handles per-client rate limiting.
 Rate limiting prevents abuse by limiting requests per time period.
+
+Two backends are available (RATE_LIMIT_BACKEND):
+- memory: in-process token bucket, for single-pod deployments
+- redis: fixed one-minute window shared through Redis, for horizontal scaling
+"""
+
+from app.core.config import Settings, settings
+from app.services.cache import CacheService, cache_service
+from starlette.requests import Request
+from typing import Dict, Optional, Union
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Atomically count a request and start the window on the first one.
+# Returns the number of requests seen in the current window.
+_INCR_WINDOW_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return count
 """
 
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from app.core.config import settings
 
-# Create a global limiter instance
-limiter = Limiter(
-    key_func=get_remote_address,  # Use client IP address to identify users
-    default_limits=[f"{settings.rate_limit_per_minute}/minute"] if settings.rate_limit_enabled else []
-)
+class TokenBucket:
+    """Token bucket state for a single client."""
+
+    __slots__ = ("tokens", "last")
+
+    def __init__(self, tokens: float, last: float):
+        self.tokens = tokens
+        self.last = last
+
+
+class RateLimiter:
+    """
+    Per-client token bucket rate limiter.
+
+    Each client starts with a full bucket of `per_minute` tokens that refills
+    continuously at `per_minute / 60` tokens per second. A request costs one
+    token. Checking a request is a dict lookup and a few float operations,
+    with no string parsing or network round-trips.
+
+    Buckets live in a bounded dict; once `max_clients` is reached the oldest
+    client's bucket is evicted (it simply starts full again next time).
+    """
+
+    def __init__(self, per_minute: int, max_clients: int = 10000):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            per_minute: Requests allowed per minute (also the burst capacity)
+            max_clients: Maximum number of client buckets kept in memory
+        """
+        self.per_minute = per_minute
+        self.capacity = float(per_minute)
+        self.refill_rate = per_minute / 60.0  # Tokens per second
+        self.max_clients = max_clients
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    async def check(self, key: str) -> bool:
+        """
+        Consume one token for the given client.
+
+        Args:
+            key: Client identifier (usually the remote IP address)
+
+        Returns:
+            True if the request is allowed, False if the client is over its limit
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+
+        if bucket is None:
+            if len(self._buckets) >= self.max_clients:
+                # Dicts keep insertion order, so the first key is the oldest client
+                del self._buckets[next(iter(self._buckets))]
+            bucket = self._buckets[key] = TokenBucket(self.capacity, now)
+        else:
+            bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.last) * self.refill_rate)
+            bucket.last = now
+
+        if bucket.tokens >= 1.0:
+            bucket.tokens -= 1.0
+            return True
+        return False
+
+    def reset(self):
+        """Forget all client buckets."""
+        self._buckets.clear()
+
+
+class RedisRateLimiter:
+    """
+    Per-client rate limiter shared across processes through Redis.
+
+    Each request runs one Lua script (INCR + EXPIRE on the first hit) via
+    EVALSHA: a single atomic round-trip, and one short-lived key per client
+    per window. If Redis is unavailable, requests fall back to the local
+    token bucket so limiting keeps working per process.
+    """
+
+    WINDOW_SECONDS = 60
+    KEY_PREFIX = "rl:"
+
+    def __init__(self, per_minute: int, cache: CacheService, fallback: RateLimiter):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            per_minute: Requests allowed per client per minute
+            cache: Cache service whose Redis connection is used
+            fallback: Local limiter used while Redis is unavailable
+        """
+        self.per_minute = per_minute
+        self._cache = cache
+        self._fallback = fallback
+        self._script = None
+        self._script_client = None
+
+    async def check(self, key: str) -> bool:
+        """
+        Count one request for the given client.
+
+        Args:
+            key: Client identifier (usually the remote IP address)
+
+        Returns:
+            True if the request is allowed, False if the client is over its limit
+        """
+        client = self._cache.redis_client
+        if not self._cache._connected or client is None:
+            return await self._fallback.check(key)
+
+        # Register the script once per client; redis-py uses EVALSHA and
+        # loads the script automatically if the server does not have it yet
+        if self._script_client is not client:
+            self._script = client.register_script(_INCR_WINDOW_SCRIPT)
+            self._script_client = client
+
+        try:
+            count = await self._script(keys=[self.KEY_PREFIX + key], args=[self.WINDOW_SECONDS])
+        except Exception as e:
+            logger.error(f"Error checking rate limit in Redis: {e}")
+            return await self._fallback.check(key)
+
+        return int(count) <= self.per_minute
+
+    def reset(self):
+        """Forget local fallback state (Redis keys expire on their own)."""
+        self._fallback.reset()
+
+
+def get_client_key(request: Request) -> str:
+    """
+    Identify the client for rate limiting.
+
+    Returns:
+        Remote IP address (or 127.0.0.1 if none found)
+    """
+    if not request.client or not request.client.host:
+        return "127.0.0.1"
+    return request.client.host
+
+
+async def get_rate_limiter(request: Request) -> Optional[Union[RateLimiter, RedisRateLimiter]]:
+    """
+    FastAPI dependency returning the rate limiter of the app serving the request.
+    
+    The limiter is built by create_app() and stored on app.state, so each app
+    instance (e.g. one built in a test with a tiny limit) has its own.
+    
+    Returns:
+        The app's rate limiter, or None if rate limiting is disabled
+    """
+    return request.app.state.rate_limiter
 
-# This will be used to handle rate limit errors
-rate_limit_exceeded_handler = _rate_limit_exceeded_handler
 
+def create_rate_limiter(
+    config: Settings,
+    cache: CacheService = cache_service
+) -> Optional[Union[RateLimiter, RedisRateLimiter]]:
+    """
+    Build the rate limiter described by the given settings.
+    
+    Args:
+        config: Settings to read the rate limit configuration from
+        cache: Cache service used by the Redis backend
+        
+    Returns:
+        A rate limiter, or None if rate limiting is disabled
+    """
+    if not config.rate_limit_enabled:
+        return None
+    
+    local = RateLimiter(
+        per_minute=config.rate_limit_per_minute,
+        max_clients=config.rate_limit_max_clients
+    )
+    if config.rate_limit_backend == "redis":
+        return RedisRateLimiter(per_minute=config.rate_limit_per_minute, cache=cache, fallback=local)
+    return local
@@ -6,44 +6,77 @@ Fixtures are reusable test components (like test database, mock services, etc.)
 """
 
 import pytest
-from fastapi.testclient import TestClient
-from unittest.mock import AsyncMock, MagicMock, patch
-import asyncio
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from cachetools import TTLCache
+import orjson
 import os
 
-# Set test environment variable BEFORE any imports
-os.environ["ENVIRONMENT"] = "test"
 
-# Mock Redis connection BEFORE importing app
-# This prevents startup_event from trying to connect to real Redis
-from app.services.cache import cache_service
+class _MockRedis:
+    """
+    Minimal in-process stand-in for the async Redis client.
+    
+    Plain coroutines over a dict are much cheaper per call than
+    MagicMock/AsyncMock, and behave like Redis for the commands we use.
+    get_calls counts lookups so tests can check whether Redis was queried.
+    """
+    
+    def __init__(self):
+        self.data = {}
+        self.get_calls = 0
+    
+    async def get(self, key):
+        self.get_calls += 1
+        return self.data.get(key)
+    
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+        return True
+    
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+    
+    async def ping(self):
+        return True
+    
+    async def close(self):
+        return None
+
 
 # Create a mock Redis client that will be used during app startup
-mock_redis_client = MagicMock()
-mock_redis_client.ping = AsyncMock(return_value=True)
-mock_redis_client.get = AsyncMock(return_value=None)
-mock_redis_client.setex = AsyncMock(return_value=True)
-mock_redis_client.close = AsyncMock(return_value=None)
-
-# Mock the connect method to use our mock client
-# This MUST be done before importing app
-async def mock_connect():
-    """Mock connect that doesn't actually connect to Redis."""
-    # Set mock client and connected state
-    cache_service.redis_client = mock_redis_client
-    cache_service._connected = True
-    # Return immediately (no actual connection)
-    return
+mock_redis_client = _MockRedis()
 
-# Replace the connect method with our mock BEFORE importing app
-cache_service.connect = mock_connect
-# Pre-set connected state and mock client so connect() can be a no-op
-cache_service._connected = True
-cache_service.redis_client = mock_redis_client
 
-# Now import app - it will use the mocked Redis connection
-from app.main import app
-from app.services.model import model_service
+def pytest_configure(config):
+    """
+    Prepare the test environment once per process, before any test module
+    imports the app.
+    
+    - Sets ENVIRONMENT=test before the settings are loaded
+    - Replaces cache_service.connect with a no-op and installs the mock
+      client, so nothing ever tries to connect to a real Redis server
+      (app startup itself is a no-op when ENVIRONMENT=test)
+    """
+    # Set test environment variable BEFORE any app imports
+    os.environ["ENVIRONMENT"] = "test"
+    
+    from app.services.cache import cache_service
+    
+    if getattr(cache_service, "_mock_installed", False):
+        return
+    
+    async def mock_connect():
+        """No-op connect: the mock client is installed below."""
+    
+    cache_service.connect = mock_connect
+    # Pre-set connected state and mock client so connect() can be a no-op
+    cache_service._connected = True
+    cache_service.redis_client = mock_redis_client
+    cache_service._mock_installed = True
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -51,37 +84,78 @@ def setup_test_environment():
     """
     Automatically set up test environment for all tests.
     This runs once per test session.
+    
+    Yields the shared mock Redis client (installed in pytest_configure),
+    so fixtures that need it get the same instance by reference.
     """
-    # Ensure Redis is mocked
-    cache_service._connected = True
-    cache_service.redis_client = mock_redis_client
-    yield
-    # Cleanup (if needed)
-    pass
+    yield mock_redis_client
 
 
-@pytest.fixture
-def client():
+@pytest_asyncio.fixture(scope="session")
+async def client(setup_test_environment):
     """
-    Create a test client for the FastAPI app.
+    Create an async test client for the FastAPI app.
     
-    TestClient is a synchronous wrapper around FastAPI that allows us to
-    make HTTP requests to our app without running a server.
+    httpx.AsyncClient with ASGITransport calls the ASGI app directly on the
+    test event loop, so no server (and no sync-to-async thread hop) is needed.
     
     Why use it:
     - Fast: No network overhead
     - Easy: Simple request/response testing
-    - Isolated: Each test gets a fresh client
     
-    Note: Redis connection is mocked automatically before app import.
-    TestClient will trigger startup events, but they'll use the mocked Redis.
+    Why session-scoped:
+    - The app's lifespan (startup/shutdown) runs once per test run
+      instead of once per test; tests only read responses, so sharing is safe
+    
+    Note: Redis connection is mocked in pytest_configure, before the app is
+    imported here; with ENVIRONMENT=test the lifespan itself is a no-op.
     """
-    # Ensure mock is in place before creating TestClient
-    cache_service._connected = True
-    cache_service.redis_client = mock_redis_client
+    from app.main import app
     
-    # Create TestClient - startup events will use mocked Redis
-    return TestClient(app)
+    # ASGITransport does not send lifespan events, so run the lifespan here
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as c:
+            yield c
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limiter(request):
+    """
+    Give every test that uses the shared client a fresh rate limit budget.
+    
+    The shared client always uses the same client address, so without this
+    the per-client budget would carry over from test to test. Tests that
+    don't use the client skip this, so they never import the app.
+    """
+    yield
+    if "client" not in request.fixturenames:
+        return
+    
+    from app.main import app
+    
+    if app.state.rate_limiter is not None:
+        app.state.rate_limiter.reset()
+
+
+@pytest.fixture
+def fresh_app():
+    """
+    Build a separate app with a rate limit of 2 requests per minute.
+    
+    Used by tests that need their own limiter state. The app's lifespan is
+    not run, so it shares the already-mocked cache and model services.
+    """
+    from app.core.config import Settings
+    from app.main import create_app
+    
+    return create_app(Settings(rate_limit_per_minute=2))
+
+
+@pytest_asyncio.fixture
+async def fresh_client(fresh_app):
+    """Async test client for fresh_app (without lifespan, see fresh_app)."""
+    async with AsyncClient(transport=ASGITransport(app=fresh_app), base_url="http://testserver") as c:
+        yield c
 
 
 @pytest.fixture
@@ -90,73 +164,54 @@ def mock_redis():
     Mock Redis connection for testing.
     
     This allows us to test caching without needing a real Redis server.
-    We mock the Redis client methods (get, set, ping) to return expected values.
+    Each test gets its own empty in-memory store.
     
     Why mock:
     - No external dependencies needed
     - Tests run faster
     - Tests are more reliable (no network issues)
-    
-    Note: Returns AsyncMock objects for async methods, but fixture itself is sync
-    so it can be used in sync tests.
     """
-    from unittest.mock import AsyncMock
-    
-    # Store cache data in memory for testing
-    cache_data = {}
-    
-    async def mock_get(key):
-        return cache_data.get(key)
-    
-    async def mock_setex(key, ttl, value):
-        cache_data[key] = value
-        return True
-    
-    async def mock_ping():
-        return True
-    
-    async def mock_close():
-        return None
-    
-    # Create mock client with async methods
-    mock_client = MagicMock()
-    mock_client.ping = AsyncMock(side_effect=mock_ping)
-    mock_client.get = AsyncMock(side_effect=mock_get)
-    mock_client.setex = AsyncMock(side_effect=mock_setex)
-    mock_client.close = AsyncMock(side_effect=mock_close)
-    
-    return mock_client
+    return _MockRedis()
 
 
 @pytest.fixture
-def mock_redis_connected(mock_redis):
+def mock_redis_connected(mock_redis, monkeypatch):
     """
     Fixture that mocks Redis and connects it to cache_service.
     
     This sets up the cache service with a mock Redis client so we can
     test caching behavior without a real Redis instance.
-    
-    Why synchronous:
-    - TestClient from FastAPI is synchronous
-    - We mock the async methods but use sync test client
-    - This is simpler and works well for integration tests
+    monkeypatch restores the original client after the test, even if it fails.
     """
-    # Save original client
-    original_client = cache_service.redis_client
-    original_connected = cache_service._connected
-    
-    # Replace with mock
-    cache_service.redis_client = mock_redis
-    cache_service._connected = True
-    
-    yield mock_redis
-    
-    # Restore original
-    cache_service.redis_client = original_client
-    cache_service._connected = original_connected
-
-
-@pytest.fixture
+    from app.services.cache import cache_service
+    
+    # Replace with mock and start from an empty in-process cache,
+    # so every lookup reaches the mock Redis client
+    local = cache_service._local
+    monkeypatch.setattr(cache_service, "redis_client", mock_redis)
+    monkeypatch.setattr(cache_service, "_connected", True)
+    if local is not None:
+        monkeypatch.setattr(cache_service, "_local", TTLCache(maxsize=local.maxsize, ttl=local.ttl))
+    return mock_redis
+
+
+# Sample test data, built once per process
+# (tests must copy rather than mutate these)
+SAMPLE_INFERENCE_REQUEST = {
+    "prompt": "What is artificial intelligence?",
+    "max_tokens": 50,
+    "temperature": 0.7
+}
+
+SAMPLE_INFERENCE_RESPONSE = {
+    "output": "Model response to: What is artificial intelligence?...",
+    "tokens_used": 15,
+    "model_version": "1.0.0",
+    "model_name": "default-model"
+}
+
+
+@pytest.fixture(scope="session")
 def sample_inference_request():
     """
     Sample inference request data for testing.
@@ -164,24 +219,23 @@ def sample_inference_request():
     This is a reusable test data fixture that provides consistent
     test input across multiple tests.
     """
-    return {
-        "prompt": "What is artificial intelligence?",
-        "max_tokens": 50,
-        "temperature": 0.7
-    }
+    return SAMPLE_INFERENCE_REQUEST
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_inference_response():
     """
     Sample inference response data for testing.
     
     This represents what the model service returns.
     """
-    return {
-        "output": "Model response to: What is artificial intelligence?...",
-        "tokens_used": 15,
-        "model_version": "1.0.0",
-        "model_name": "default-model"
-    }
+    return SAMPLE_INFERENCE_RESPONSE
+
 
+@pytest.fixture(scope="session")
+def sample_inference_response_json(sample_inference_response):
+    """
+    sample_inference_response serialized once, in the form the cache
+    service stores in Redis (orjson-encoded bytes).
+    """
+    return orjson.dumps(sample_inference_response)
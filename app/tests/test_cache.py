@@ -0,0 +1,131 @@
+"""
+Tests for Cache Service
+
+Tests verify that the cache service:
+- Generates stable, unique cache keys
+- Reads and writes through a precomputed key
+"""
+
+import pytest
+from app.services.cache import cache_service
+
+
+def test_cache_key_is_deterministic():
+    """
+    Test that identical inputs always map to the same cache key.
+
+    Why this matters:
+    - Repeated requests must hit the same cache entry
+    """
+    key_1 = cache_service.generate_cache_key("What is AI?", 50, 0.7)
+    key_2 = cache_service.generate_cache_key("What is AI?", 50, 0.7)
+
+    assert key_1 == key_2, \
+        "Same inputs should produce the same cache key"
+    assert key_1.startswith("inference:"), \
+        "Cache key should carry the inference prefix"
+
+
+def test_cache_key_differs_by_parameters():
+    """
+    Test that changing any input parameter changes the cache key.
+
+    Why this matters:
+    - A response generated with one temperature must not be served for another
+    """
+    base = cache_service.generate_cache_key("What is AI?", 50, 0.7)
+
+    assert cache_service.generate_cache_key("What is ML?", 50, 0.7) != base, \
+        "Different prompts should produce different keys"
+    assert cache_service.generate_cache_key("What is AI?", 51, 0.7) != base, \
+        "Different max_tokens should produce different keys"
+    assert cache_service.generate_cache_key("What is AI?", 50, 0.8) != base, \
+        "Different temperatures should produce different keys"
+
+
+def test_cache_key_short_and_long_prompts():
+    """
+    Test that short prompts are embedded verbatim and long prompts are hashed.
+
+    Why this matters:
+    - Short prompts skip hashing, but keys must stay bounded for long prompts
+    """
+    short_key = cache_service.generate_cache_key("hi", 50, 0.7)
+    long_prompt = "x" * 500
+    long_key = cache_service.generate_cache_key(long_prompt, 50, 0.7)
+
+    assert short_key.endswith(":hi"), \
+        "Short prompts should be embedded in the key"
+    assert long_prompt not in long_key, \
+        "Long prompts should be hashed"
+    assert len(long_key) == len("inference:") + 32, \
+        "Hashed keys should have a fixed length"
+
+
+async def test_cache_roundtrip_by_key(mock_redis_connected, sample_inference_response):
+    """
+    Test that a result stored with set_by_key() is returned by get_by_key().
+    """
+    cache_key = cache_service.generate_cache_key("roundtrip prompt", 50, 0.7)
+
+    await cache_service.set_by_key(cache_key, sample_inference_response)
+    result = await cache_service.get_by_key(cache_key)
+
+    assert result == sample_inference_response, \
+        "Cached result should round-trip unchanged"
+
+
+async def test_cache_set_keeps_existing_entry(mock_redis_connected, sample_inference_response):
+    """
+    Test that writing an already-cached key does not overwrite it.
+
+    Why this matters:
+    - Writes use SET NX, so concurrent misses for the same prompt keep
+      the first cached result instead of racing each other
+    """
+    cache_key = cache_service.generate_cache_key("set once prompt", 50, 0.7)
+    newer_response = {**sample_inference_response, "output": "newer output"}
+
+    await cache_service.set_by_key(cache_key, sample_inference_response)
+    await cache_service.set_by_key(cache_key, newer_response)
+    result = await cache_service.get_by_key(cache_key)
+
+    assert result == sample_inference_response, \
+        "Existing cache entry should not be overwritten"
+
+
+async def test_cache_local_hit_skips_redis(mock_redis_connected, sample_inference_response):
+    """
+    Test that a repeated lookup is served from the in-process cache.
+
+    Why this matters:
+    - Hot prompts should not pay a Redis round-trip + JSON decode every time
+    """
+    cache_key = cache_service.generate_cache_key("local hit prompt", 50, 0.7)
+    await cache_service.set_by_key(cache_key, sample_inference_response)
+    mock_redis_connected.get_calls = 0
+
+    result = await cache_service.get_by_key(cache_key)
+
+    assert result == sample_inference_response, \
+        "Local cache should return the stored result"
+    assert mock_redis_connected.get_calls == 0, \
+        "Redis should not be queried on a local cache hit"
+
+
+async def test_cache_works_with_local_cache_disabled(mock_redis_connected, sample_inference_response, monkeypatch):
+    """
+    Test that Redis caching still works when the local cache is off.
+    
+    Why this matters:
+    - LOCAL_CACHE_SIZE=0 must only disable the in-process layer,
+      not turn every Redis hit into a miss
+    """
+    monkeypatch.setattr(cache_service, "_local", None)
+    cache_key = cache_service.generate_cache_key("no local cache prompt", 50, 0.7)
+    
+    await cache_service.set_by_key(cache_key, sample_inference_response)
+    result = await cache_service.get_by_key(cache_key)
+    
+    assert result == sample_inference_response, \
+        "Redis hit should be returned without a local cache"
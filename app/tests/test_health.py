@@ -6,10 +6,21 @@ This is critical for Kubernetes liveness/readiness probes.
 """
 
 import pytest
+import pytest_asyncio
 from fastapi import status
 
 
-def test_health_endpoint(client):
+@pytest_asyncio.fixture(scope="session")
+async def health_response(client):
+    """
+    Response from a single GET /health, shared by the health tests.
+    
+    The endpoint returns a constant body, so one request is enough.
+    """
+    return await client.get("/health")
+
+
+async def test_health_endpoint(health_response):
     """
     Test that the health endpoint returns healthy status.
     
@@ -24,8 +35,7 @@ def test_health_endpoint(client):
     - Load balancers use this for health checks
     - Monitoring systems check this endpoint
     """
-    # Make GET request to /health
-    response = client.get("/health")
+    response = health_response
     
     # Assert status code is 200 (OK)
     assert response.status_code == status.HTTP_200_OK, \
@@ -42,14 +52,13 @@ def test_health_endpoint(client):
         "Health status should be 'healthy'"
 
 
-def test_health_endpoint_structure(client):
+async def test_health_endpoint_structure(health_response):
     """
     Test that health endpoint returns correct JSON structure.
     
     This ensures the response format is consistent and predictable.
     """
-    response = client.get("/health")
-    data = response.json()
+    data = health_response.json()
     
     # Verify it's a dictionary (JSON object)
     assert isinstance(data, dict), \
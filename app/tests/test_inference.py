@@ -10,11 +10,16 @@ Tests verify that the inference endpoint:
 
 import pytest
 from fastapi import status
-from unittest.mock import patch, AsyncMock
-import json
+from pydantic import ValidationError
+from app.api.v1.routes import InferenceRequest
+from app.services.cache import cache_service
 
 
-def test_inference_endpoint_success(client, sample_inference_request):
+# Fields every /infer response must contain
+INFERENCE_RESPONSE_FIELDS = frozenset({"output", "tokens_used", "model_version"})
+
+
+async def test_inference_endpoint_success(client, sample_inference_request):
     """
     Test that inference endpoint returns a successful response.
     
@@ -28,7 +33,7 @@ def test_inference_endpoint_success(client, sample_inference_request):
     - Clients depend on this working correctly
     """
     # Make POST request to /api/v1/infer
-    response = client.post(
+    response = await client.post(
         "/api/v1/infer",
         json=sample_inference_request
     )
@@ -41,10 +46,9 @@ def test_inference_endpoint_success(client, sample_inference_request):
     data = response.json()
     
     # Assert all required fields are present
-    required_fields = ["output", "tokens_used", "model_version"]
-    for field in required_fields:
-        assert field in data, \
-            f"Inference response should contain '{field}' field"
+    missing = INFERENCE_RESPONSE_FIELDS - data.keys()
+    assert not missing, \
+        f"Inference response is missing fields: {sorted(missing)}"
     
     # Assert field types
     assert isinstance(data["output"], str), \
@@ -59,7 +63,7 @@ def test_inference_endpoint_success(client, sample_inference_request):
         "output should not be empty"
 
 
-def test_inference_endpoint_validation_empty_prompt(client):
+async def test_inference_endpoint_validation_empty_prompt(client):
     """
     Test that inference endpoint validates input (empty prompt).
     
@@ -72,7 +76,7 @@ def test_inference_endpoint_validation_empty_prompt(client):
     - Provides clear error messages to clients
     """
     # Make request with empty prompt
-    response = client.post(
+    response = await client.post(
         "/api/v1/infer",
         json={"prompt": ""}
     )
@@ -82,86 +86,59 @@ def test_inference_endpoint_validation_empty_prompt(client):
         "Inference endpoint should reject empty prompt with 422"
 
 
-def test_inference_endpoint_validation_missing_prompt(client):
+def test_inference_request_validation_missing_prompt():
     """
-    Test that inference endpoint requires prompt field.
+    Test that inference requests require the prompt field.
     
     What we're testing:
-    - Endpoint rejects requests without prompt
-    - Returns 422 status code
+    - The request model rejects input without prompt
     
     Why this matters:
     - Ensures required fields are always provided
     - Prevents runtime errors
-    """
-    # Make request without prompt
-    response = client.post(
-        "/api/v1/infer",
-        json={}
-    )
     
-    # Assert status code is 422 (Unprocessable Entity)
-    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY, \
-        "Inference endpoint should reject missing prompt with 422"
+    Note: Validation tests call the request model directly; the 422
+    mapping through the endpoint is covered by the empty prompt test.
+    """
+    with pytest.raises(ValidationError):
+        InferenceRequest.model_validate({})
 
 
-def test_inference_endpoint_validation_invalid_max_tokens(client):
+def test_inference_request_validation_invalid_max_tokens():
     """
-    Test that inference endpoint validates max_tokens range.
+    Test that inference requests validate the max_tokens range.
     
     What we're testing:
-    - Endpoint rejects max_tokens < 1
-    - Endpoint rejects max_tokens > 1000
-    - Returns 422 status code
+    - The request model rejects max_tokens < 1
+    - The request model rejects max_tokens > 1000
     
     Why this matters:
     - Prevents invalid parameters from causing errors
     - Protects against resource exhaustion
     """
-    # Test max_tokens too low
-    response = client.post(
-        "/api/v1/infer",
-        json={"prompt": "test", "max_tokens": 0}
-    )
-    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY, \
-        "Inference endpoint should reject max_tokens < 1"
+    with pytest.raises(ValidationError):
+        InferenceRequest.model_validate({"prompt": "test", "max_tokens": 0})
     
-    # Test max_tokens too high
-    response = client.post(
-        "/api/v1/infer",
-        json={"prompt": "test", "max_tokens": 2000}
-    )
-    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY, \
-        "Inference endpoint should reject max_tokens > 1000"
+    with pytest.raises(ValidationError):
+        InferenceRequest.model_validate({"prompt": "test", "max_tokens": 2000})
 
 
-def test_inference_endpoint_validation_invalid_temperature(client):
+def test_inference_request_validation_invalid_temperature():
     """
-    Test that inference endpoint validates temperature range.
+    Test that inference requests validate the temperature range.
     
     What we're testing:
-    - Endpoint rejects temperature < 0.0
-    - Endpoint rejects temperature > 2.0
-    - Returns 422 status code
+    - The request model rejects temperature < 0.0
+    - The request model rejects temperature > 2.0
     """
-    # Test temperature too low
-    response = client.post(
-        "/api/v1/infer",
-        json={"prompt": "test", "temperature": -1.0}
-    )
-    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY, \
-        "Inference endpoint should reject temperature < 0.0"
+    with pytest.raises(ValidationError):
+        InferenceRequest.model_validate({"prompt": "test", "temperature": -1.0})
     
-    # Test temperature too high
-    response = client.post(
-        "/api/v1/infer",
-        json={"prompt": "test", "temperature": 3.0}
-    )
-    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY, \
-        "Inference endpoint should reject temperature > 2.0"
+    with pytest.raises(ValidationError):
+        InferenceRequest.model_validate({"prompt": "test", "temperature": 3.0})
 
 
-def test_inference_cache_miss(client, mock_redis_connected, sample_inference_request):
+async def test_inference_cache_miss(client, mock_redis_connected, sample_inference_request):
     """
     Test that inference endpoint handles cache miss correctly.
     
@@ -181,7 +158,7 @@ def test_inference_cache_miss(client, mock_redis_connected, sample_inference_req
     # The mock_redis fixture already returns None by default (cache miss)
     
     # Make first request (cache miss)
-    response = client.post(
+    response = await client.post(
         "/api/v1/infer",
         json=sample_inference_request
     )
@@ -196,11 +173,17 @@ def test_inference_cache_miss(client, mock_redis_connected, sample_inference_req
     assert "tokens_used" in data, "Response should contain tokens_used"
     
     # Verify cache.get was called (to check for cached value)
-    assert mock_redis_connected.get.called, \
+    assert mock_redis_connected.get_calls > 0, \
         "Cache get should be called to check for cached value"
 
 
-def test_inference_cache_hit(client, mock_redis_connected, sample_inference_request, sample_inference_response):
+async def test_inference_cache_hit(
+    client,
+    mock_redis_connected,
+    sample_inference_request,
+    sample_inference_response,
+    sample_inference_response_json
+):
     """
     Test that inference endpoint handles cache hit correctly.
     
@@ -216,15 +199,16 @@ def test_inference_cache_hit(client, mock_redis_connected, sample_inference_requ
     
     Note: This test uses a mock Redis to simulate a cache hit.
     """
-    # Set up mock Redis to return cached value
-    from unittest.mock import AsyncMock
-    cached_value = json.dumps(sample_inference_response)
-    
-    # Configure mock to return cached value when get is called
-    mock_redis_connected.get = AsyncMock(return_value=cached_value)
+    # Store the cached value under the key the endpoint will look up
+    cache_key = cache_service.generate_cache_key(
+        sample_inference_request["prompt"],
+        sample_inference_request["max_tokens"],
+        sample_inference_request["temperature"]
+    )
+    mock_redis_connected.data[cache_key] = sample_inference_response_json
     
     # Make request (should be cache hit)
-    response = client.post(
+    response = await client.post(
         "/api/v1/infer",
         json=sample_inference_request
     )
@@ -239,10 +223,10 @@ def test_inference_cache_hit(client, mock_redis_connected, sample_inference_requ
     assert "tokens_used" in data, "Response should contain tokens_used"
     
     # Verify cache.get was called
-    assert mock_redis_connected.get.called, \
+    assert mock_redis_connected.get_calls > 0, \
         "Cache get should be called to check for cached value"
     
-    # Verify response matches cached data (if cache is working)
-    # Note: The actual output might be different due to model service,
-    # but we verify the structure is correct
+    # Verify response matches cached data
+    assert data["output"] == sample_inference_response["output"], \
+        "Cache hit should return the cached output"
 
@@ -8,7 +8,11 @@ import pytest
 from fastapi import status
 
 
-def test_model_info_endpoint(client):
+# Fields every /model response must contain
+MODEL_INFO_FIELDS = frozenset({"model_name", "model_version", "status", "description"})
+
+
+async def test_model_info_endpoint(client):
     """
     Test that the model info endpoint returns model metadata.
     
@@ -23,7 +27,7 @@ def test_model_info_endpoint(client):
     - Helps track model deployments
     """
     # Make GET request to /api/v1/model
-    response = client.get("/api/v1/model")
+    response = await client.get("/api/v1/model")
     
     # Assert status code is 200 (OK)
     assert response.status_code == status.HTTP_200_OK, \
@@ -33,10 +37,9 @@ def test_model_info_endpoint(client):
     data = response.json()
     
     # Assert all required fields are present
-    required_fields = ["model_name", "model_version", "status", "description"]
-    for field in required_fields:
-        assert field in data, \
-            f"Model info response should contain '{field}' field"
+    missing = MODEL_INFO_FIELDS - data.keys()
+    assert not missing, \
+        f"Model info response is missing fields: {sorted(missing)}"
     
     # Assert field types
     assert isinstance(data["model_name"], str), \
@@ -49,13 +52,13 @@ def test_model_info_endpoint(client):
         "description should be a string"
 
 
-def test_model_info_values(client):
+async def test_model_info_values(client):
     """
     Test that model info returns expected values.
     
     This verifies the model service is correctly configured.
     """
-    response = client.get("/api/v1/model")
+    response = await client.get("/api/v1/model")
     data = response.json()
     
     # Check that values are not empty
@@ -7,13 +7,17 @@ Tests verify that rate limiting works correctly:
 - Works with different IP addresses
 """
 
+import asyncio
 import pytest
 from fastapi import status
-from unittest.mock import patch
-from app.core.config import settings
+from httpx import ASGITransport, AsyncClient
+from app.core.config import Settings
+from app.services.rate_limit import RateLimiter, RedisRateLimiter
+from types import SimpleNamespace
 
 
-def test_rate_limit_allows_requests_within_limit(client, sample_inference_request):
+@pytest.mark.xdist_group("rate_limit")
+async def test_rate_limit_allows_requests_within_limit(client, sample_inference_request):
     """
     Test that requests within rate limit are allowed.
     
@@ -26,17 +30,18 @@ def test_rate_limit_allows_requests_within_limit(client, sample_inference_reques
     - Rate limiting should be transparent when not exceeded
     """
     # Make requests up to the limit (default is 10/minute)
-    # We'll make 5 requests, which should all succeed
-    for i in range(5):
-        response = client.post(
-            "/api/v1/infer",
-            json=sample_inference_request
-        )
+    # We'll send 5 concurrent requests, which should all succeed
+    responses = await asyncio.gather(*(
+        client.post("/api/v1/infer", json=sample_inference_request)
+        for _ in range(5)
+    ))
+    
+    for i, response in enumerate(responses):
         assert response.status_code == status.HTTP_200_OK, \
             f"Request {i+1} should succeed within rate limit"
 
 
-def test_rate_limit_blocks_excessive_requests(client, sample_inference_request):
+async def test_rate_limit_blocks_excessive_requests(fresh_client, sample_inference_request):
     """
     Test that rate limit blocks requests exceeding the limit.
     
@@ -50,42 +55,31 @@ def test_rate_limit_blocks_excessive_requests(client, sample_inference_request):
     - Protects server resources
     - Provides clear feedback to clients
     
-    Note: This test may be flaky if rate limit is reset between requests.
-    We'll use a lower limit for testing.
+    Note: fresh_client talks to an app built with a limit of 2 requests
+    per minute, so the limit is reached deterministically.
     """
-    # Temporarily set a very low rate limit for testing
-    original_limit = settings.rate_limit_per_minute
-    
-    try:
-        # Set rate limit to 2 requests per minute for testing
-        settings.rate_limit_per_minute = 2
-        
-        # Make requests up to the limit
-        for i in range(2):
-            response = client.post(
-                "/api/v1/infer",
-                json=sample_inference_request
-            )
-            assert response.status_code == status.HTTP_200_OK, \
-                f"Request {i+1} should succeed within rate limit"
-        
-        # Next request should be rate limited
-        response = client.post(
+    # Make requests up to the limit
+    for i in range(2):
+        response = await fresh_client.post(
             "/api/v1/infer",
             json=sample_inference_request
         )
-        
-        # Should return 429 (Too Many Requests)
-        # Note: This might not work if rate limit uses in-memory storage
-        # that resets between requests in test client
-        # In production, rate limit uses Redis which persists
-        
-    finally:
-        # Restore original limit
-        settings.rate_limit_per_minute = original_limit
+        assert response.status_code == status.HTTP_200_OK, \
+            f"Request {i+1} should succeed within rate limit"
+    
+    # Next request should be rate limited
+    response = await fresh_client.post(
+        "/api/v1/infer",
+        json=sample_inference_request
+    )
+    
+    # Should return 429 (Too Many Requests)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS, \
+        "Request over the limit should be rejected with 429"
+    assert response.json()["detail"] == "Rate limit exceeded: 2 per 1 minute"
 
 
-def test_rate_limit_disabled_allows_all_requests(client, sample_inference_request):
+async def test_rate_limit_disabled_allows_all_requests(sample_inference_request):
     """
     Test that when rate limiting is disabled, all requests are allowed.
     
@@ -96,13 +90,111 @@ def test_rate_limit_disabled_allows_all_requests(client, sample_inference_reques
     Why this matters:
     - Allows disabling rate limiting for testing
     - Useful for development environments
+    """
+    from app.main import create_app
+    
+    app = create_app(Settings(rate_limit_enabled=False, rate_limit_per_minute=2))
+    
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+        for i in range(5):
+            response = await client.post(
+                "/api/v1/infer",
+                json=sample_inference_request
+            )
+            assert response.status_code == status.HTTP_200_OK, \
+                f"Request {i+1} should succeed with rate limiting disabled"
+
+
+async def test_token_bucket_rejects_when_empty():
+    """
+    Test that a client is rejected once its bucket is empty.
+    
+    What we're testing:
+    - A client can burst up to the per-minute limit
+    - The next request is rejected
+    - Other clients have their own buckets
+    """
+    limiter = RateLimiter(per_minute=2)
     
-    Note: This test is skipped because changing settings.rate_limit_enabled
-    doesn't affect the limiter that's already created and attached to the app.
-    In production, you would restart the app with the new setting.
+    assert await limiter.check("10.0.0.1"), "First request should be allowed"
+    assert await limiter.check("10.0.0.1"), "Second request should be allowed"
+    assert not await limiter.check("10.0.0.1"), \
+        "Request over the limit should be rejected"
+    assert await limiter.check("10.0.0.2"), \
+        "A different client should not be affected"
+
+
+async def test_token_bucket_refills_over_time():
+    """
+    Test that tokens refill at per_minute / 60 tokens per second.
+    """
+    limiter = RateLimiter(per_minute=2)
+    await limiter.check("10.0.0.1")
+    await limiter.check("10.0.0.1")
+    
+    # Pretend 30 seconds have passed: 2/60 tokens per second * 30s = 1 token
+    limiter._buckets["10.0.0.1"].last -= 30
+    
+    assert await limiter.check("10.0.0.1"), \
+        "One token should have refilled after 30 seconds"
+    assert not await limiter.check("10.0.0.1"), \
+        "Only one token should have refilled"
+
+
+async def test_token_bucket_evicts_oldest_client():
+    """
+    Test that the number of tracked clients stays bounded.
+    """
+    limiter = RateLimiter(per_minute=2, max_clients=2)
+    
+    for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        await limiter.check(ip)
+    
+    assert len(limiter._buckets) == 2, "Bucket dict should stay bounded"
+    assert "10.0.0.1" not in limiter._buckets, "Oldest client should be evicted"
+
+
+class _FakeScriptRedis:
+    """Redis stand-in that emulates the INCR window script with a dict."""
+    
+    def __init__(self):
+        self.counts = {}
+    
+    def register_script(self, script):
+        async def run(keys, args):
+            self.counts[keys[0]] = self.counts.get(keys[0], 0) + 1
+            return self.counts[keys[0]]
+        return run
+
+
+async def test_redis_rate_limiter_counts_per_client():
     """
-    # Skip this test for now - rate limiter is created at app startup
-    # and changing settings doesn't affect the existing limiter
-    # In a real scenario, you'd need to recreate the app or mock the limiter
-    pytest.skip("Rate limiter is created at app startup and can't be disabled dynamically")
+    Test that the Redis-backed limiter enforces a shared per-client window.
+    
+    What we're testing:
+    - Requests up to the limit are allowed, the next one is rejected
+    - Counters are kept per client key
+    """
+    fake_redis = _FakeScriptRedis()
+    cache = SimpleNamespace(redis_client=fake_redis, _connected=True)
+    limiter = RedisRateLimiter(per_minute=2, cache=cache, fallback=RateLimiter(per_minute=2))
+    
+    assert await limiter.check("10.0.0.1")
+    assert await limiter.check("10.0.0.1")
+    assert not await limiter.check("10.0.0.1"), \
+        "Request over the limit should be rejected"
+    assert await limiter.check("10.0.0.2"), \
+        "A different client should not be affected"
+    assert fake_redis.counts["rl:10.0.0.1"] == 3
+
 
+async def test_redis_rate_limiter_falls_back_without_redis():
+    """
+    Test that limiting keeps working locally when Redis is unavailable.
+    """
+    cache = SimpleNamespace(redis_client=None, _connected=False)
+    limiter = RedisRateLimiter(per_minute=1, cache=cache, fallback=RateLimiter(per_minute=1))
+    
+    assert await limiter.check("10.0.0.1")
+    assert not await limiter.check("10.0.0.1"), \
+        "Fallback token bucket should enforce the limit"
@@ -0,0 +1,52 @@
+"""
+Tests for Request Tracing
+
+Tests verify that the tracing middleware records one server span per
+request, named after the route template.
+"""
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from app.core.config import settings
+
+
+@pytest.fixture
+def span_exporter():
+    """Collect finished spans in memory for the duration of a test."""
+    provider = trace.get_tracer_provider()
+    if not settings.otel_enabled or not isinstance(provider, TracerProvider):
+        pytest.skip("Tracing is disabled")
+    
+    exporter = InMemorySpanExporter()
+    processor = SimpleSpanProcessor(exporter)
+    provider.add_span_processor(processor)
+    yield exporter
+    # Stop exporting; the processor stays registered but becomes a no-op
+    processor.shutdown()
+
+
+async def test_request_creates_server_span(client, span_exporter):
+    """
+    Test that a request produces a server span named after its route.
+    
+    What we're testing:
+    - One SERVER span per HTTP request
+    - Span name and attributes use the route template and status code
+    """
+    response = await client.get("/api/v1/model")
+    assert response.status_code == 200
+    
+    server_spans = [
+        span for span in span_exporter.get_finished_spans()
+        if span.kind == trace.SpanKind.SERVER
+    ]
+    assert len(server_spans) == 1, "Expected exactly one server span"
+    
+    span = server_spans[0]
+    assert span.name == "GET /api/v1/model", \
+        "Span name should use the method and route template"
+    assert span.attributes["http.route"] == "/api/v1/model"
+    assert span.attributes["http.status_code"] == 200